@@ -1,23 +1,76 @@
 import argparse
+import asyncio
+import json
 import logging
+import os
+import re
+import socket
+import stat
 import sys
-from datetime import timedelta, datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, datetime, date
+from functools import partial
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-import yfinance as yf
 import mysql.connector as mysql
+from mysql.connector import errorcode, pooling
+
+# Maximum number of rows sent to the database in a single INSERT statement
+INSERT_CHUNK_SIZE = 5000
+
+# Allowed characters of a ticker symbol, which is also used as table name
+TICKER_PATTERN = re.compile(r'^[A-Za-z0-9_.^=-]+$')
+
+# Connection pool, created on the first call to connect_to_database(). A one-shot run only needs a single
+# connection, since the pool opens all of its connections up front; the daemon uses DAEMON_POOL_SIZE.
+POOL = None
+DAEMON_POOL_SIZE = 4
+
+# HTTP cache for the Yahoo Finance requests, created on the first call to get_yfinance_session(). yfinance 0.2.60
+# and later only accept curl_cffi sessions and reject requests_cache sessions, so the cache is disabled there.
+YF_SESSION = None
+YF_CACHE_ENABLED = True
+YF_FIRST_VERSION_WITHOUT_CACHE = (0, 2, 60)
+YF_CACHE_PATH = "~/.cache/yf.sqlite"
+YF_CACHE_EXPIRE_SECONDS = 3600
+
+# yf.download keeps its results in module-level state, so concurrent daemon requests must not download at once
+YF_DOWNLOAD_LOCK = threading.Lock()
+
+# Unix domain socket the daemon listens on, and how long the client waits (in seconds) to connect to the daemon and
+# for its reply, which may include a download from Yahoo Finance
+SOCKET_PATH = "/tmp/finance.sock"
+DAEMON_CONNECT_TIMEOUT = 1
+DAEMON_REPLY_TIMEOUT = 60
+
+# Default Unix domain socket of the local MySQL server, used by the daemon instead of TCP if it exists
+MYSQL_UNIX_SOCKET = "/var/run/mysqld/mysqld.sock"
+
+
+# Raised when Yahoo Finance does not know a ticker that has no table yet.
+class InvalidTickerError(ValueError):
+    pass
 
 
 # Connects to the MySQL database using the specified credentials. Exits the application if the connection fails.
-def connect_to_database():
+# Connections are handed out from a pool so that repeated calls reuse already authenticated sessions.
+# If unix_socket is given, the pool connects through the local MySQL socket instead of TCP.
+def connect_to_database(unix_socket=None, pool_size=1):
+    global POOL
     try:
-        db = mysql.connect(
-            user="finance",
-            password="finance-pass",
-            host="localhost",
-            port=3306,
-            database="financial_analysis"
-        )
+        if POOL is None:
+            config = dict(
+                user="finance",
+                password="finance-pass",
+                host="localhost",
+                port=3306,
+                database="financial_analysis"
+            )
+            if unix_socket:
+                config["unix_socket"] = unix_socket
+            POOL = pooling.MySQLConnectionPool(pool_name="fin", pool_size=pool_size, **config)
+        db = POOL.get_connection()
         logging.debug("Connected to MySQL DB!")
         return db
     except mysql.Error as e:
@@ -25,17 +78,57 @@ def connect_to_database():
         sys.exit(1)
 
 
-# Parses command-line arguments for the ticker symbol, start date, end date, and verbosity level.
+# Returns a cached HTTP session for yfinance so that repeated identical requests are answered from a local SQLite
+# cache. Returns None if requests_cache is not installed or the installed yfinance does not accept its sessions,
+# in which case yfinance uses its own session.
+def get_yfinance_session():
+    global YF_SESSION, YF_CACHE_ENABLED
+    if YF_SESSION is None and YF_CACHE_ENABLED:
+        import yfinance as yf
+        version = tuple(int(part) for part in re.findall(r'\d+', yf.__version__)[:3])
+        if version >= YF_FIRST_VERSION_WITHOUT_CACHE:
+            logging.debug(f"yfinance {yf.__version__} does not accept cached sessions, responses are not cached")
+            YF_CACHE_ENABLED = False
+            return None
+        try:
+            import requests_cache
+        except ImportError:
+            logging.debug("requests_cache is not installed, Yahoo Finance responses are not cached")
+            YF_CACHE_ENABLED = False
+            return None
+        YF_SESSION = requests_cache.CachedSession(os.path.expanduser(YF_CACHE_PATH),
+                                                  expire_after=YF_CACHE_EXPIRE_SECONDS)
+    return YF_SESSION
+
+
+# Stops passing the cached session to yfinance, used when yfinance rejects it.
+def disable_yfinance_session():
+    global YF_SESSION, YF_CACHE_ENABLED
+    YF_SESSION = None
+    YF_CACHE_ENABLED = False
+
+
+# Parses command-line arguments for the ticker symbol, start date, end date, verbosity level and daemon mode.
 def parse_arguments():
     parser = argparse.ArgumentParser(
         description='Script for downloading and analyzing stock data. The data is stored in a database and displayed '
                     'using Plotly. Not saved data will be downloaded from Yahoo Finance.')
-    parser.add_argument('-t', '--ticker', type=str, help='Ticker symbol der Aktie', required=True)
-    parser.add_argument('-s', '--startdate', type=str, help='Start date (YYYY-MM-DD)', required=True)
-    parser.add_argument('-e', '--enddate', type=str, help='End date (YYYY-MM-DD)', required=True)
+    parser.add_argument('-t', '--ticker', type=str, help='Ticker symbol der Aktie')
+    parser.add_argument('-s', '--startdate', type=str, help='Start date (YYYY-MM-DD)')
+    parser.add_argument('-e', '--enddate', type=str, help='End date (YYYY-MM-DD)')
     parser.add_argument('-v', '--verbosity', type=str, help='Verbosity level (DEBUG, INFO, WARNING, ERROR, CRITICAL)',
                         default='CRITICAL')
-    return parser.parse_args()
+    parser.add_argument('-d', '--daemon', action='store_true',
+                        help='Run as daemon serving requests on a Unix domain socket')
+    parser.add_argument('--socket', type=str, help=f'Path of the daemon socket (default: {SOCKET_PATH})',
+                        default=SOCKET_PATH)
+    parser.add_argument('--mysql-socket', type=str, default=MYSQL_UNIX_SOCKET,
+                        help=f'Unix socket of the MySQL server used by the daemon, empty to use TCP '
+                             f'(default: {MYSQL_UNIX_SOCKET})')
+    args = parser.parse_args()
+    if not args.daemon and not (args.ticker and args.startdate and args.enddate):
+        parser.error("the following arguments are required: -t/--ticker, -s/--startdate, -e/--enddate")
+    return args
 
 
 # Sets the logging level based on the specified verbosity.
@@ -56,69 +149,125 @@ def set_logging_level(verbosity):
 
 # Downloads historical stock data from Yahoo Finance for the specified ticker and date range.
 def download_data(ticker, start_date, end_date):
+    # imported here so that runs failing on argument validation do not pay for loading yfinance
+    import yfinance as yf
     logging.info("Downloading data...")
     end_date += timedelta(days=1)
-    data_full = yf.download(ticker, start=start_date, end=end_date)
-    data_filtered = data_full[["Close"]]
+    session = get_yfinance_session()
+    # only a rejected session is retried without the cache; yfinance versions without YFDataException accept it
+    try:
+        from yfinance.exceptions import YFDataException
+        session_errors = (YFDataException,) if session is not None else ()
+    except ImportError:
+        session_errors = ()
+    with YF_DOWNLOAD_LOCK:
+        try:
+            data_full = yf.download(ticker, start=start_date, end=end_date, actions=False, threads=True,
+                                    progress=False, session=session)
+        except session_errors as e:
+            logging.warning(f"yfinance rejected the cached session, downloading without cache: {e}")
+            disable_yfinance_session()
+            data_full = yf.download(ticker, start=start_date, end=end_date, actions=False, threads=True,
+                                    progress=False)
+    if data_full.empty:
+        return pd.DataFrame({"Close": pd.Series(dtype='float64')}, index=pd.DatetimeIndex([]))
+    close = data_full["Close"]
+    # newer yfinance versions index the columns by (price, ticker) even for a single ticker; the column is picked
+    # by name so that data of any other ticker can never end up in this table
+    if isinstance(close, pd.DataFrame):
+        close = close[ticker.upper()]
+    # to_frame() wraps the selected column without the copy done by a list indexer
+    data_filtered = close.to_frame("Close")
     return data_filtered
 
 
+# Downloads the data for all missing date ranges with a single request covering the enclosing span
+# and keeps only the rows that fall on one of the missing business days.
+def download_missing_data(ticker, missing_ranges):
+    global_start = min(r[0] for r in missing_ranges)
+    global_end = max(r[1] for r in missing_ranges)
+    data = download_data(ticker, global_start, global_end)
+    missing_days = pd.DatetimeIndex(np.concatenate([get_business_days(r[0], r[1]) for r in missing_ranges]))
+    # days without a quote (e.g. holidays) come back as NaN from reindex and are dropped
+    return data.reindex(missing_days).dropna()
+
+
 # Saves the downloaded data to the MySQL database under the specified ticker table.
 def save_data_to_database(conn, data, ticker):
     try:
-        cursor = conn.cursor()
-        counter = 0
-
-        for row in data.iterrows():
-            date = row[0].strftime('%Y-%m-%d')
-            cursor.execute(f"INSERT INTO `{ticker}` (date, close) VALUES (%s, %s)", (date, row[1]["Close"]))
-            counter += 1
+        # uniqueness and foreign key checks are disabled for the bulk load; the date primary key is still enforced
+        session_cursor = conn.cursor()
+        session_cursor.execute("SET SESSION unique_checks=0")
+        session_cursor.execute("SET SESSION foreign_key_checks=0")
+        session_cursor.execute("START TRANSACTION")
+        cursor = conn.cursor(prepared=True)
+        # extract whole columns at once instead of building a Series per row; dates are bound as
+        # datetime.date so the binary protocol sends them natively instead of as formatted strings
+        dates = data.index.date
+        closes = data["Close"].to_numpy(dtype='float64')
+        rows = list(zip(dates.tolist(), closes.tolist()))
+
+        # each chunk is sent as one multi-row INSERT. The prepared cursor re-prepares whenever it is passed a
+        # different statement object (an identity check, not a text comparison), so the statement for full chunks
+        # is built once and reused; only a trailing partial chunk gets a statement of its own
+        insert = f"INSERT IGNORE INTO `{ticker}` (date, close) VALUES "
+        full_chunk_statement = insert + ", ".join(["(%s, %s)"] * INSERT_CHUNK_SIZE)
+        for i in range(0, len(rows), INSERT_CHUNK_SIZE):
+            chunk = rows[i:i + INSERT_CHUNK_SIZE]
+            if len(chunk) == INSERT_CHUNK_SIZE:
+                statement = full_chunk_statement
+            else:
+                statement = insert + ", ".join(["(%s, %s)"] * len(chunk))
+            cursor.execute(statement, [value for row in chunk for value in row])
         conn.commit()
-        logging.debug(f"Inserted {counter} rows of data")
+        session_cursor.execute("SET SESSION unique_checks=1")
+        session_cursor.execute("SET SESSION foreign_key_checks=1")
+        logging.debug(f"Inserted {len(rows)} rows of data")
     except mysql.Error as e:
         logging.error(f"Error inserting data: {e}")
         sys.exit(1)
 
 
 # Creates a new table for the specified ticker if it does not already exist in the database.
-def create_table(conn, ticker):
+def ensure_table(conn, ticker):
     try:
-        logging.debug(f"Creating table {ticker}")
+        logging.debug(f"Ensuring table {ticker} exists")
         cursor = conn.cursor()
-        cursor.execute(f"CREATE TABLE `{ticker}` (date DATE, close DECIMAL(10, 2))")
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS `{ticker}` (date DATE PRIMARY KEY, close DOUBLE NOT NULL) "
+                       f"ENGINE=InnoDB")
         conn.commit()
     except mysql.Error as e:
         logging.error(f"Error creating table: {e}")
         sys.exit(1)
 
 
-# Checks if a table for the specified ticker already exists in the database.
-def check_table_exists(conn, ticker):
-    try:
-        cursor = conn.cursor()
-        cursor.execute(f"SHOW TABLES LIKE '{ticker}'")
-        result = cursor.fetchone()
-        if result:
-            logging.debug(f"Table {ticker} exists")
-            return True
-        else:
-            logging.debug(f"Table {ticker} does not exist")
-            return False
-    except mysql.Error as e:
-        logging.error(f"Error checking table: {e}")
-        sys.exit(1)
-
-
 # Retrieves the saved data from the database for the specified ticker and date range.
 def get_data_from_database(conn, ticker, start_date, end_date):
     try:
         logging.debug("Getting data from database...")
-        cursor = conn.cursor()
-        cursor.execute(f"select * from `{ticker}` where date between %s and %s order by date desc",
+        # rows are streamed from an unbuffered cursor into preallocated arrays instead of a list of tuples
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(f"select date, close from `{ticker}` where date between %s and %s order by date desc",
                        (start_date, end_date))
-        data_from_db = cursor.fetchall()
+        # one row per day fits tables with the date primary key; tables created by older versions have no key
+        # and may hold duplicate dates, so the arrays are grown when they run full
+        n = (end_date - start_date).days + 1
+        dates = np.empty(n, dtype='datetime64[D]')
+        closes = np.empty(n, dtype='float64')
+        count = 0
+        for day, close in cursor:
+            if count == len(dates):
+                dates = np.concatenate([dates, np.empty_like(dates)])
+                closes = np.concatenate([closes, np.empty_like(closes)])
+            dates[count] = day
+            closes[count] = close
+            count += 1
+        data_from_db = pd.DataFrame({'date': dates[:count], 'close': closes[:count]})
         return data_from_db
     except mysql.Error as e:
+        # a missing table is handled by Service.get_data, which creates it for new tickers
+        if e.errno == errorcode.ER_NO_SUCH_TABLE:
+            raise
         logging.error(f"Error getting data: {e}")
         sys.exit(1)
 
@@ -127,22 +276,30 @@ def get_data_from_database(conn, ticker, start_date, end_date):
 def display_data(data):
     logging.debug(f"data to display:")
     logging.debug(data)
+    import plotly.graph_objects as go
     logging.info("Creating plot and displaying data...")
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=[x[0] for x in data], y=[x[1] for x in data], mode='lines', name='close'))
+    fig.add_trace(go.Scatter(x=data['date'], y=data['close'], mode='lines', name='close'))
     fig.show()
 
 
 # Validate ticker symbol and throw error if invalid
+# Only the format is checked here; whether Yahoo Finance knows the ticker is checked by ticker_exists() when the
+# ticker is requested for the first time.
 def validate_ticker(ticker):
-    data = yf.download(ticker, start="2024-06-10", end="2024-06-14")
-    try:
-        if data["Close"].empty:
-            raise ValueError("Invalid ticker symbol")
-        return ticker
-    except ValueError:
+    # the ticker is used as table name, which cannot be passed as a query parameter
+    if not TICKER_PATTERN.match(ticker):
         print("Invalid ticker symbol. Please try again with a valid ticker symbol.")
         sys.exit(1)
+    return ticker
+
+
+# Checks whether Yahoo Finance knows the ticker by downloading its last few days. The window is long enough to
+# contain trading days even around holidays.
+def ticker_exists(ticker):
+    end_date = date.today()
+    data = download_data(ticker, end_date - timedelta(days=10), end_date)
+    return not data.empty
 
 
 # Validates the format of the start and end dates and ensures the start date is not after the end date.
@@ -159,16 +316,24 @@ def validate_date(start_date, end_date):
         sys.exit(1)
 
 
+# Returns the business days (Monday to Friday) between start and end date as a datetime64[D] array.
+def get_business_days(start_date, end_date):
+    days = np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
+    return days[np.is_busday(days)]
+
+
 # Checks if the data already exists in the database for the given date range
 def get_missing_dates(conn, start_date, end_date, ticker):
-    user_dates = pd.bdate_range(start=start_date, end=end_date)
+    user_dates = get_business_days(start_date, end_date)
+    if user_dates.size == 0:
+        return None
+    # the set difference is computed by the server so only the missing dates are transferred
     cursor = conn.cursor()
-    cursor.execute(f"select date from `{ticker}` where date between %s and %s", (start_date, end_date))
-    existing_dates = cursor.fetchall()
-    df_existing_dates = pd.DataFrame(existing_dates, columns=['date'])
-    df_existing_dates['date'] = pd.to_datetime(df_existing_dates['date'])
-    missing_dates = user_dates[~user_dates.isin(df_existing_dates['date'])]
-    if missing_dates.empty:
+    values = ", ".join(["ROW(CAST(%s AS DATE))"] * len(user_dates))
+    cursor.execute(f"select v.d from (values {values}) as v(d) left join `{ticker}` t on t.date = v.d "
+                   f"where t.date is null order by v.d", user_dates.astype(object).tolist())
+    missing_dates = np.array([row[0] for row in cursor.fetchall()], dtype='datetime64[D]')
+    if missing_dates.size == 0:
         return None
     else:
         return get_missing_ranges_by_dates(missing_dates)
@@ -176,51 +341,230 @@ def get_missing_dates(conn, start_date, end_date, ticker):
 
 # Splits the missing dates into ranges with first and last date
 def get_missing_ranges_by_dates(missing_dates):
-    missing_ranges = []
-    start_missing = missing_dates[0]
-    end_missing = missing_dates[0]
+    # a new range starts wherever two consecutive missing dates are not one day apart
+    gaps = np.diff(missing_dates).astype('timedelta64[D]').astype(int)
+    split_points = np.where(gaps != 1)[0] + 1
+    missing_ranges = [(segment[0].astype(object), segment[-1].astype(object))
+                      for segment in np.split(missing_dates, split_points)]
+    logging.debug(f"Missing date ranges: {missing_ranges}")
+    return missing_ranges
+
 
-    for current_date in missing_dates[1:]:
-        if (current_date - end_missing).days == 1:
-            end_missing = current_date
+# Loads the data for a ticker and date range. Missing data is downloaded and saved first, then the data is read
+# from the database. Each call takes its own connection from the pool, so the daemon can serve requests in parallel.
+class Service:
+    def __init__(self, unix_socket=None, pool_size=1):
+        self.unix_socket = unix_socket
+        self.pool_size = pool_size
+
+    def get_data(self, ticker, start_date, end_date):
+        conn = connect_to_database(self.unix_socket, self.pool_size)
+        try:
+            try:
+                data_from_db = self.load(conn, ticker, start_date, end_date)
+            except mysql.Error as e:
+                if e.errno != errorcode.ER_NO_SUCH_TABLE:
+                    raise
+                # first request for this ticker: the table is only created once Yahoo Finance knows the ticker,
+                # so unknown tickers never leave a table behind
+                logging.debug(f"Table {ticker} does not exist")
+                if not ticker_exists(ticker):
+                    raise InvalidTickerError(f"Invalid ticker symbol {ticker}")
+                ensure_table(conn, ticker)
+                data_from_db = self.load(conn, ticker, start_date, end_date)
+            conn.commit()
+            return data_from_db
+        except BaseException:
+            # the helpers exit via SystemExit on errors, so this also catches those; nothing of a failed request,
+            # e.g. the chunks of a partially sent bulk insert, is committed
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    # Downloads and saves the missing data, then reads the data from the database. Raises mysql.Error with
+    # ER_NO_SUCH_TABLE from its first query if the table for the ticker does not exist.
+    def load(self, conn, ticker, start_date, end_date):
+        # check if data exists in the database for the given date range. If not, download and save only the
+        # missing data
+        missing_dates = get_missing_dates(conn, start_date, end_date, ticker)
+        if missing_dates is None:
+            logging.debug("Data already exists in the database for the given date range")
         else:
-            missing_ranges.append((start_missing, end_missing))
-            start_missing = current_date
-            end_missing = current_date
+            logging.debug(f"Data missing for the following date ranges: {missing_dates}")
+            # all missing ranges are downloaded with one request and saved in one transaction
+            data = download_missing_data(ticker, missing_dates)
+            save_data_to_database(conn, data, ticker)
 
-    # Append the last range
-    missing_ranges.append((start_missing.date(), end_missing.date()))
-    logging.debug(f"Missing date ranges: {missing_ranges}")
-    return missing_ranges
+        return get_data_from_database(conn, ticker, start_date, end_date)
+
+
+# Parses a daemon request line into ticker, start date and end date. Raises ValueError, KeyError or TypeError if the
+# request is malformed.
+def parse_request(line):
+    request = json.loads(line)
+    ticker = request["ticker"]
+    if not TICKER_PATTERN.match(ticker):
+        raise ValueError(f"invalid ticker symbol {ticker}")
+    return ticker, date.fromisoformat(request["startdate"]), date.fromisoformat(request["enddate"])
+
+
+# Handles one daemon request: reads a JSON line with ticker, start and end date and answers with the data as JSON.
+# Every request gets a reply, an error reply if anything goes wrong.
+async def handle_request(service, executor, reader, writer):
+    try:
+        line = await reader.readline()
+    except ConnectionError:
+        line = b''
+    if not line:
+        # the client closed the connection without sending a request
+        writer.close()
+        return
+    try:
+        ticker, start_date, end_date = parse_request(line)
+    except (ValueError, KeyError, TypeError) as e:
+        logging.error(f"Invalid request: {e}")
+        response = {"error": f"Invalid request: {e}"}
+    else:
+        try:
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(executor, service.get_data, ticker, start_date, end_date)
+            response = {
+                "date": np.datetime_as_string(data["date"].to_numpy(), unit='D').tolist(),
+                "close": data["close"].tolist()
+            }
+        except InvalidTickerError as e:
+            response = {"error": str(e), "invalid_ticker": True}
+        except SystemExit:
+            # the helper functions log the error and exit, which must not stop the daemon
+            response = {"error": "Request failed, see the daemon log for details"}
+        except Exception as e:
+            logging.exception(f"Error handling request: {e}")
+            response = {"error": f"Request failed: {e}"}
+    try:
+        writer.write((json.dumps(response) + "\n").encode())
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+    except (ConnectionError, BrokenPipeError):
+        # the client went away before reading the reply
+        logging.debug("Client closed the connection before the reply was sent")
+        writer.close()
+
+
+# Removes a socket file left behind by a daemon that is no longer running. Exits the application if the path is
+# not a socket or another daemon is still listening on it.
+def remove_stale_socket(socket_path):
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        logging.error(f"{socket_path} exists and is not a socket")
+        sys.exit(1)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            logging.debug(f"Removing stale socket {socket_path}")
+            os.remove(socket_path)
+            return
+    logging.error(f"Another daemon is already listening on {socket_path}")
+    sys.exit(1)
+
+
+# Runs the daemon. The connection pool and yfinance are set up once and reused for every request.
+# The database is reached through mysql_socket if it exists, otherwise through TCP.
+def run_daemon(socket_path, mysql_socket):
+    import yfinance  # noqa: F401 - imported once up front so requests do not pay for it
+    remove_stale_socket(socket_path)
+    if mysql_socket and not os.path.exists(mysql_socket):
+        logging.warning(f"MySQL socket {mysql_socket} not found, connecting via TCP")
+        mysql_socket = None
+    service = Service(unix_socket=mysql_socket, pool_size=DAEMON_POOL_SIZE)
+    connect_to_database(mysql_socket, DAEMON_POOL_SIZE).close()
+    executor = ThreadPoolExecutor(max_workers=DAEMON_POOL_SIZE)
+    socket_inode = None
+
+    async def serve():
+        nonlocal socket_inode
+        server = await asyncio.start_unix_server(partial(handle_request, service, executor), path=socket_path)
+        socket_inode = os.stat(socket_path).st_ino
+        logging.info(f"Daemon listening on {socket_path}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        logging.info("Daemon stopped")
+    finally:
+        executor.shutdown()
+        # only remove the socket this daemon created
+        try:
+            if socket_inode is not None and os.stat(socket_path).st_ino == socket_inode:
+                os.remove(socket_path)
+        except FileNotFoundError:
+            pass
+
+
+# Requests the data from a running daemon. Returns None if the daemon cannot be used, e.g. because none is
+# listening on the socket, the socket belongs to another user or the daemon does not answer in time.
+def request_from_daemon(socket_path, ticker, start_date, end_date):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.settimeout(DAEMON_CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        except OSError as e:
+            logging.warning(f"Cannot connect to daemon on {socket_path}: {e}")
+            return None
+        logging.debug(f"Requesting data from daemon on {socket_path}")
+        request = {"ticker": ticker, "startdate": start_date.isoformat(), "enddate": end_date.isoformat()}
+        try:
+            sock.settimeout(DAEMON_REPLY_TIMEOUT)
+            sock.sendall((json.dumps(request) + "\n").encode())
+            with sock.makefile("r") as stream:
+                reply = stream.readline()
+        except OSError as e:
+            logging.warning(f"No reply from daemon on {socket_path}: {e}")
+            return None
+    try:
+        response = json.loads(reply)
+        if not isinstance(response, dict) or not ("error" in response or {"date", "close"} <= response.keys()):
+            raise ValueError(f"unexpected reply {reply!r}")
+    except ValueError as e:
+        logging.error(f"Invalid reply from daemon: {e}")
+        sys.exit(1)
+    if response.get("invalid_ticker"):
+        print("Invalid ticker symbol. Please try again with a valid ticker symbol.")
+        sys.exit(1)
+    if "error" in response:
+        logging.error(f"Error getting data from daemon: {response['error']}")
+        sys.exit(1)
+    return pd.DataFrame({'date': np.array(response["date"], dtype='datetime64[D]'),
+                         'close': np.array(response["close"], dtype='float64')})
 
 
 if __name__ == "__main__":
     # arguments are parsed and validated
     args = parse_arguments()
     set_logging_level(args.verbosity)
-    ticker = validate_ticker(args.ticker)
+    if args.daemon:
+        run_daemon(args.socket, args.mysql_socket)
+        sys.exit(0)
     start_date, end_date = validate_date(args.startdate, args.enddate)
-    # connect to the database
-    conn = connect_to_database()
-    # check if table exists, if not call create_table()
-    if not check_table_exists(conn, ticker):
-        create_table(conn, ticker)
-
-    # check if data exists in the database for the given date range. If not, download and save only the missing data
-    missing_dates = get_missing_dates(conn, start_date, end_date, ticker)
-    if missing_dates is None:
-        logging.debug("Data already exists in the database for the given date range")
-    else:
-        logging.debug("Data missing for the following date ranges")
-        for date_range in missing_dates:
-            logging.debug(date_range)
-            data = download_data(ticker, date_range[0], date_range[1])
-            save_data_to_database(conn, data, ticker)
+    ticker = validate_ticker(args.ticker)
 
-    # get data from the database and display it
-    data_from_db = get_data_from_database(conn, ticker, start_date, end_date)
+    # get the data from a running daemon, or load it directly if there is none
+    data_from_db = request_from_daemon(args.socket, ticker, start_date, end_date)
+    if data_from_db is None:
+        logging.debug("No daemon running, loading data directly")
+        try:
+            data_from_db = Service().get_data(ticker, start_date, end_date)
+        except InvalidTickerError:
+            print("Invalid ticker symbol. Please try again with a valid ticker symbol.")
+            sys.exit(1)
     display_data(data_from_db)
-    # close the connection and exit the program
-    conn.commit()
-    conn.close()
     sys.exit(0)